@@ -4,53 +4,115 @@ app.py - Streamlit app for interactive exploration
 Run:
     streamlit run scripts/app.py
 Notes:
- - The app prefers outputs/sample_metadata.csv (fast). If missing it tries data/metadata.csv.
+ - The app prefers outputs/sample_metadata.parquet, then outputs/sample_metadata.csv (fast). If both are missing it tries data/metadata.csv.
  - The app will warn if key columns (title, publish_time, authors, journal, source_x) are absent.
 """
 import io
 import os
+import re
 
-import matplotlib.pyplot as plt
+import matplotlib
+
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+import numpy as np
 import pandas as pd
-import streamlit as st 
-import wordcloud as wc
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pcsv
+import pyarrow.parquet as pq
+import streamlit as st
+from wordcloud import WordCloud
 
 st.set_page_config(page_title="CORD-19 Explorer", layout="wide")
 st.title("CORD-19-style Metadata Explorer")
 st.markdown("Interactive exploration: filter by year/source/title, view charts, generate word cloud, and download filtered CSV.")
 
+DATA_PARQUET = "outputs/sample_metadata.parquet"
 DATA_SAMPLE = "outputs/sample_metadata.csv"
 DATA_FULL = "data/metadata.csv"
+# columns the app analyses, plus the identifiers kept for the filtered CSV download
+NEEDED = ["title", "abstract", "authors", "journal", "source_x", "publish_time", "sha", "doi", "pmcid", "pubmed_id", "license"]
+
+_SEP_RE = re.compile(r"[ /\-#]")
+_COL_RE = re.compile(r"[^0-9a-zA-Z_]")
+
+
+def _norm(c):
+    return _COL_RE.sub("", _SEP_RE.sub("_", c.strip().lower()))
+
+
+def data_path():
+    # prefer the sample (faster), and its Parquet copy over the CSV (no text parsing)
+    for path in (DATA_PARQUET, DATA_SAMPLE):
+        if os.path.exists(path):
+            return path
+    return DATA_FULL
+
 
 @st.cache_data
 def load_df():
-    # prefer the sample (faster)
-    path = DATA_SAMPLE if os.path.exists(DATA_SAMPLE) else DATA_FULL
+    path = data_path()
     if not os.path.exists(path):
-        st.error("No metadata found. Put metadata.csv in data/ or run scripts/explore.py to create outputs/sample_metadata.csv.")
+        st.error("No metadata found. Put metadata.csv in data/ or run scripts/explore.py to create outputs/sample_metadata.parquet.")
         st.stop()
-    df = pd.read_csv(path, low_memory=False, on_bad_lines="warn")
+    if path.endswith(".parquet"):
+        columns = [c for c in pq.read_schema(path).names if _norm(c) in NEEDED]
+        df = pd.read_parquet(path, columns=columns, dtype_backend="pyarrow")
+    else:
+        # only parse the columns the app uses; the pyarrow engine needs an explicit list, so match the header
+        header = pd.read_csv(path, nrows=0).columns
+        usecols = [c for c in header if _norm(c) in NEEDED]
+        df = pd.read_csv(
+            path, engine="pyarrow", dtype_backend="pyarrow", usecols=usecols, na_values=["", "NA", "N/A"], on_bad_lines="warn"
+        )
     # normalize columns same way as explore.py
-    df.columns = (
-        df.columns.str.strip()
-        .str.lower()
-        .str.replace(r"[ \/\-#]", "_", regex=True)
-        .str.replace(r"[^0-9a-zA-Z_]", "", regex=True)
-    )
+    df.columns = [_norm(c) for c in df.columns]
+    # pin text fields to Arrow strings (Arrow infers empty columns as null, year-only dates as int64)
+    # (Parquet keeps publish_time as a timestamp already)
+    for c in ("title", "abstract", "authors", "journal", "source_x", "publish_time"):
+        if c in df.columns and not pd.api.types.is_datetime64_any_dtype(df[c]):
+            df[c] = df[c].astype("string[pyarrow]")
     # ensure columns exist
     if "publish_time" in df.columns:
         df["publish_time"] = pd.to_datetime(df["publish_time"], errors="coerce")
         df["year"] = df["publish_time"].dt.year
     else:
         df["year"] = pd.NA
-    df["title"] = df.get("title", "").fillna("").astype(str)
-    df["abstract"] = df.get("abstract", "").fillna("").astype(str)
-    df["authors"] = df.get("authors", "").fillna("").astype(str)
-    df["journal"] = df.get("journal", "").fillna("").astype(str)
-    df["source_x"] = df.get("source_x", "").fillna("").astype(str)
-    df["abstract_word_count"] = df["abstract"].str.split().str.len()
+    # filter-invariant year stats, computed once here and carried on the frame (attrs survive the cache)
+    years = df["year"].dropna()
+    df.attrs["has_year"] = not years.empty
+    df.attrs["year_min"], df.attrs["year_max"] = (int(years.min()), int(years.max())) if not years.empty else (2018, 2023)
+    df["title"] = df.get("title", "").fillna("")
+    df["abstract"] = df.get("abstract", "").fillna("")
+    df["authors"] = df.get("authors", "").fillna("")
+    # low-cardinality labels as categoricals: value_counts becomes a bincount over integer codes.
+    # Missing values go into an "Unknown" category once here, so callers need no fillna pass.
+    for c in ("source_x", "journal"):
+        cat = df[c].astype("category")
+        if "Unknown" not in cat.cat.categories:  # already present when re-reading our own outputs
+            cat = cat.cat.add_categories(["Unknown"])
+        df[c] = cat.fillna("Unknown")
+    # sources actually present, for the sidebar; kept on the frame so it always matches this load
+    df.attrs["sources"] = tuple(sorted(df["source_x"].unique()))
+    # whitespace token count in one Arrow regex scan instead of a Python list per row; RE2's \s is
+    # ASCII-only, so the class also excludes the Unicode separators str.split() treats as whitespace
+    df["abstract_word_count"] = pd.Series(
+        pc.count_substring_regex(pa.array(df["abstract"]), r"[^\s\pZ\v\x1c-\x1f\x{85}]+").to_numpy(zero_copy_only=False),
+        index=df.index,
+    )
     return df
 
+
+@st.cache_data(max_entries=8)
+def _to_csv_bytes(path, filters, _filtered):
+    # Arrow's C++ CSV writer; filters is the cache key, the frame itself is not hashed.
+    # Bounded: each entry holds a blob as large as the filtered frame, shared by all sessions.
+    buf = io.BytesIO()
+    pcsv.write_csv(pa.Table.from_pandas(_filtered, preserve_index=False), buf)
+    return buf.getvalue()
+
+
 df = load_df()
 
 # Check required columns and show a warning if missing
@@ -61,8 +123,7 @@ if missing:
 
 # Sidebar filters
 st.sidebar.header("Filters")
-min_year = int(df["year"].dropna().min()) if df["year"].notna().any() else 2018
-max_year = int(df["year"].dropna().max()) if df["year"].notna().any() else 2023
+min_year, max_year, has_year = df.attrs["year_min"], df.attrs["year_max"], df.attrs["has_year"]
 
 # ✅ fixed indentation and logic here
 if min_year == max_year:
@@ -76,19 +137,26 @@ else:
         (min_year, max_year)
     )
 
-sources = ["All"] + sorted(df["source_x"].fillna("Unknown").unique().tolist()) if "source_x" in df.columns else ["All"]
+sources = ["All"] + list(df.attrs["sources"]) if "source_x" in df.columns else ["All"]
 selected_source = st.sidebar.selectbox("Source", sources)
 title_query = st.sidebar.text_input("Title contains (case-insensitive)")
 top_n = st.sidebar.slider("Top N journals", 5, 30, 10)
 
-# Apply filters
-filtered = df.copy()
-if df["year"].notna().any():
-    filtered = filtered[(filtered["year"] >= year_range[0]) & (filtered["year"] <= year_range[1])]
+# Apply filters: build one combined mask and slice once (no intermediate frames)
+mask = np.ones(len(df), dtype=bool)
+if has_year:
+    years = df["year"].to_numpy(dtype="float64", na_value=np.nan)
+    mask &= years >= year_range[0]
+    mask &= years <= year_range[1]
 if selected_source != "All":
-    filtered = filtered[filtered["source_x"].fillna("Unknown") == selected_source]
+    # compare the integer category codes directly rather than building a pandas Series
+    src = df["source_x"].cat
+    mask &= src.codes.to_numpy() == src.categories.get_loc(selected_source)
 if title_query.strip():
-    filtered = filtered[filtered["title"].str.contains(title_query, case=False, na=False)]
+    # Arrow substring kernel on the string[pyarrow] buffer instead of a per-row regex
+    title_mask = pc.match_substring(df["title"].array.__arrow_array__(), title_query, ignore_case=True)
+    mask &= title_mask.to_numpy(zero_copy_only=False)
+filtered = df.loc[mask]
 
 st.markdown(f"Showing {len(filtered)} papers (filtered) — total rows in file: {len(df)}")
 
@@ -97,10 +165,15 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("Publications by year")
-    if filtered["year"].notna().any():
-        yc = filtered["year"].dropna().astype(int).value_counts().sort_index()
-        fig, ax = plt.subplots(figsize=(6, 3))
-        ax.bar(yc.index, yc.values)
+    # the year filter already drops rows without a year, so any filtered row has one
+    if has_year and len(filtered):
+        # dense integer domain: bincount offset by the first year, no hashing or sort
+        years = filtered["year"].dropna().to_numpy(dtype=np.int32)
+        first = years.min()
+        counts = np.bincount(years - first)
+        fig = Figure(figsize=(6, 3))
+        ax = fig.subplots()
+        ax.bar(np.arange(first, first + len(counts)), counts)
         ax.set_xlabel("Year")
         ax.set_ylabel("Count")
         st.pyplot(fig)
@@ -110,12 +183,14 @@ with col1:
 with col2:
     st.subheader(f"Top {top_n} journals")
     if "journal" in filtered.columns:
-        top_j = filtered["journal"].fillna("Unknown").value_counts().head(top_n)
-        fig2, ax2 = plt.subplots(figsize=(6, 3))
-        ax2.bar(range(len(top_j)), top_j.values)
-        ax2.set_xticks(range(len(top_j)))
-        ax2.set_xticklabels(top_j.index, rotation=45, ha="right")
-        st.pyplot(fig2)
+        top_j = filtered["journal"].value_counts().head(top_n)
+        top_j = top_j[top_j > 0]  # categorical counts also list journals filtered out
+        fig = Figure(figsize=(6, 3))
+        ax = fig.subplots()
+        ax.bar(range(len(top_j)), top_j.values)
+        ax.set_xticks(range(len(top_j)))
+        ax.set_xticklabels(top_j.index, rotation=45, ha="right")
+        st.pyplot(fig)
     else:
         st.write("No journal column available.")
 
@@ -126,18 +201,18 @@ if st.button("Generate word cloud"):
         st.write("No titles available for a word cloud.")
     else:
         wc = WordCloud(width=900, height=400, background_color="white").generate(titles_text)
-        fig3, ax3 = plt.subplots(figsize=(9, 4))
+        fig3 = Figure(figsize=(9, 4))
+        ax3 = fig3.subplots()
         ax3.imshow(wc, interpolation="bilinear")
         ax3.axis("off")
         st.pyplot(fig3)
 
 st.subheader("Data sample")
 display_cols = [c for c in ["title", "authors", "journal", "year", "abstract_word_count"] if c in filtered.columns]
-st.dataframe(filtered[display_cols].head(200), use_container_width=True)
+st.dataframe(filtered.loc[:, display_cols].iloc[:200], use_container_width=True)
 
-# Download filtered CSV
-buf = io.StringIO()
-filtered.to_csv(buf, index=False)
-st.download_button("Download filtered CSV", buf.getvalue().encode("utf-8"), file_name="filtered_metadata.csv", mime="text/csv")
+# Download filtered CSV (serialized only when the filters change)
+csv_bytes = _to_csv_bytes(data_path(), (year_range, selected_source, title_query), filtered)
+st.download_button("Download filtered CSV", csv_bytes, file_name="filtered_metadata.csv", mime="text/csv")
 
-st.info("If app is slow, run: python scripts/explore.py --input data/metadata.csv --outdir outputs --sample_size 5000 first to create outputs/sample_metadata.csv (faster).")
\ No newline at end of file
+st.info("If app is slow, run: python scripts/explore.py --input data/metadata.csv --outdir outputs --sample_size 5000 first to create outputs/sample_metadata.parquet and outputs/sample_metadata.csv (faster; the app loads the Parquet copy first).")
\ No newline at end of file
@@ -5,7 +5,7 @@ explore.py
 - Cleans and normalizes columns
 - Produces:
     - cleaned CSV: outputs/metadata_cleaned.csv
-    - sample CSV for fast iteration: outputs/sample_metadata.csv
+    - sample CSV for fast iteration: outputs/sample_metadata.csv (plus a Parquet copy the app loads first)
     - plots saved into outputs/: publications_by_year.png, top_journals.png, top_sources.png, wordcloud_titles.png
     - CSV of top title words: outputs/top_title_words.csv
 
@@ -17,22 +17,44 @@ import os
 import re
 from collections import Counter
 
-import matplotlib.pyplot as plt
+import matplotlib
+
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pcsv
 from wordcloud import WordCloud
 
+try:
+    import numba as nb
+except ImportError:  # optional: title_word_counts falls back to the pandas tokenizer
+    nb = None
+
 # -------------------------
 # Helper functions
 # -------------------------
+_SEP_RE = re.compile(r"[ /\-#]")
+_COL_RE = re.compile(r"[^0-9a-zA-Z_]")
+
+
+def _norm(c):
+    return _COL_RE.sub("", _SEP_RE.sub("_", c.strip().lower()))
+
+
 def normalize_columns(df):
     # make columns predictable: lower, strip, replace spaces and special chars with underscores
-    new_cols = (
-        df.columns.str.strip()
-        .str.lower()
-        .str.replace(r"[ \/\-#]", "_", regex=True)
-        .str.replace(r"[^0-9a-zA-Z_]", "", regex=True)
-    )
-    df.columns = new_cols
+    df.columns = [_norm(c) for c in df.columns]
+    return df
+
+
+def ensure_text_dtypes(df):
+    # Arrow infers all-empty columns as null and year-only dates as int64; pin text fields to Arrow strings
+    for c in ("title", "abstract", "authors", "journal", "source_x", "publish_time"):
+        if c in df.columns:
+            df[c] = df[c].astype("string[pyarrow]")
     return df
 
 
@@ -40,9 +62,219 @@ def ensure_dir(d):
     os.makedirs(d, exist_ok=True)
 
 
+def write_csv(df, path):
+    # Arrow's C++ CSV writer; fall back to pandas for anything Arrow can't convert
+    try:
+        pcsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), path)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        df.to_csv(path, index=False)
+
+
+if nb is not None:
+
+    @nb.njit(cache=True)
+    def _is_word_byte(b):
+        # ASCII [0-9A-Za-z_], i.e. \w for ASCII-only rows (non-ASCII rows go through the regex path)
+        return b == 95 or 48 <= b <= 57 or 65 <= b <= 90 or 97 <= b <= 122
+
+    @nb.njit(cache=True)
+    def _row_tokens(buf, lo, hi, stop_hashes, hashes, starts, ends, k):
+        # walk one string; FNV-1a hash each lowercased token of 3+ characters that isn't a stopword.
+        # With hashes=None only the number of kept tokens is returned.
+        i = lo
+        while i < hi:
+            if not _is_word_byte(buf[i]):
+                i += 1
+                continue
+            j = i
+            h = np.uint64(14695981039346656037)
+            while j < hi and _is_word_byte(buf[j]):
+                b = buf[j]
+                if 65 <= b <= 90:
+                    b += 32
+                h = (h ^ np.uint64(b)) * np.uint64(1099511628211)
+                j += 1
+            if j - i >= 3:
+                pos = np.searchsorted(stop_hashes, h)
+                if pos == len(stop_hashes) or stop_hashes[pos] != h:
+                    if hashes is not None:
+                        hashes[k] = h
+                        starts[k] = i
+                        ends[k] = j
+                    k += 1
+            i = j
+        return k
+
+    @nb.njit(parallel=True, cache=True)
+    def _tokenize(buf, offsets, skip, stop_hashes):
+        # two passes over the rows: count kept tokens, then fill each row's slice of the output
+        n = len(offsets) - 1
+        counts = np.zeros(n, dtype=np.int64)
+        for r in nb.prange(n):
+            if not skip[r]:
+                counts[r] = _row_tokens(buf, offsets[r], offsets[r + 1], stop_hashes, None, None, None, 0)
+        first = np.zeros(n + 1, dtype=np.int64)
+        first[1:] = np.cumsum(counts)
+        hashes = np.empty(first[n], dtype=np.uint64)
+        starts = np.empty(first[n], dtype=np.int64)
+        ends = np.empty(first[n], dtype=np.int64)
+        rows = np.empty(first[n], dtype=np.int64)
+        for r in nb.prange(n):
+            if not skip[r]:
+                _row_tokens(buf, offsets[r], offsets[r + 1], stop_hashes, hashes, starts, ends, first[r])
+                rows[first[r] : first[r + 1]] = r
+        return hashes, starts, ends, rows
+
+
+def _utf8_buffers(strings):
+    # zero-copy views of an Arrow string array's data bytes and row offsets
+    arr = strings.combine_chunks() if isinstance(strings, pa.ChunkedArray) else pa.array(strings)
+    arr = arr.cast(pa.large_string())
+    offsets = np.frombuffer(arr.buffers()[1], dtype=np.int64)[arr.offset : arr.offset + len(arr) + 1]
+    data = arr.buffers()[2]
+    buf = np.frombuffer(data, dtype=np.uint8) if data is not None else np.empty(0, dtype=np.uint8)
+    return buf, offsets
+
+
+# runs of non-whitespace as str.split() sees it; RE2's \s is ASCII-only, so add Unicode separators
+# (\pZ: NBSP, thin space, ...), \v, the \x1c-\x1f information separators and NEL
+_NON_SPACE_RUN = r"[^\s\pZ\v\x1c-\x1f\x{85}]+"
+
+
+def count_words(s):
+    # whitespace-separated token count, same as s.str.split().str.len() but one Arrow regex scan, no per-row lists
+    return pd.Series(pc.count_substring_regex(pa.array(s), _NON_SPACE_RUN).to_numpy(zero_copy_only=False), index=s.index)
+
+
+def _counter_word_counts(titles, stopwords):
+    # plain join + re.findall + Counter; faster than per-row str.findall/explode and the baseline by construction
+    text = " ".join(titles.dropna().to_numpy(dtype=object)).lower()
+    words = re.findall(r"\b\w+\b", text)
+    most = Counter(w for w in words if w not in stopwords and len(w) > 2).most_common()
+    return pd.Series([c for _, c in most], index=pd.Index([w for w, _ in most], name="word"), name="count", dtype="int64")
+
+
+def _regex_tokens(titles, rows, stopwords):
+    # baseline \b\w+\b tokenizer (3+ characters, stopwords dropped) over the given row positions;
+    # returns word, row and within-row position of every kept token
+    # object dtype so lower() is Python's str.lower (context-sensitive, e.g. final sigma), not Arrow's utf8_lower
+    sub = pd.Series(titles.iloc[rows].to_numpy(dtype=object), index=rows, dtype=object)
+    tokens = sub.str.lower().str.findall(r"\b\w{3,}\b").explode().dropna()
+    tokens = tokens[~tokens.isin(stopwords)]
+    pos = tokens.groupby(level=0).cumcount().to_numpy()
+    return pd.DataFrame({"word": tokens.to_numpy(dtype=object), "row": tokens.index.to_numpy(), "pos": pos})
+
+
+def title_word_counts(titles, stopwords):
+    # word -> count for 3+ character title tokens, most common first, ties in first-occurrence order
+    if nb is None:
+        return _counter_word_counts(titles, stopwords)
+    titles = titles.fillna("")
+    rows = np.arange(len(titles))
+    # the Numba kernel handles ASCII-only rows; rows with any non-ASCII byte need Unicode \w, so regex them
+    arr = pa.array(titles)
+    non_ascii = ~pc.string_is_ascii(arr).to_numpy(zero_copy_only=False)
+    no_stops = np.empty(0, dtype=np.uint64)
+    # only stopwords the ASCII kernel could emit verbatim; anything else can't match an ASCII token
+    stops = sorted(w for w in stopwords if re.fullmatch(r"[0-9a-z_]{3,}", w))
+    stop_hashes = np.unique(_tokenize(*_utf8_buffers(stops), np.zeros(len(stops), dtype=np.bool_), no_stops)[0])
+    buf, offsets = _utf8_buffers(arr)
+    hashes, starts, ends, tok_rows = _tokenize(buf, offsets, non_ascii, stop_hashes)
+    _, first, counts = np.unique(hashes, return_index=True, return_counts=True)
+    words = [buf[starts[i] : ends[i]].tobytes().decode("ascii").lower() for i in first]
+    fast = pd.DataFrame({"word": words, "row": tok_rows[first], "pos": starts[first], "count": counts})
+    slow = _regex_tokens(titles, rows[non_ascii], stopwords).assign(count=1)
+    tokens = pd.concat([fast, slow], ignore_index=True)
+    # order by first occurrence so groupby(sort=False) + a stable sort keep Counter.most_common's tie order
+    tokens = tokens.sort_values(["row", "pos"], kind="stable")
+    counts = tokens.groupby("word", sort=False)["count"].sum()
+    return counts.sort_values(ascending=False, kind="stable").rename("count").rename_axis("word")
+
+
 def safe_read_csv(path):
     # read with a bit of tolerance for large files / weird lines
-    return pd.read_csv(path, low_memory=False, keep_default_na=True, na_values=["", "NA", "N/A"], on_bad_lines="warn")
+    # pyarrow engine + Arrow dtypes: text columns land as contiguous string[pyarrow] buffers
+    return pd.read_csv(
+        path,
+        engine="pyarrow",
+        dtype_backend="pyarrow",
+        keep_default_na=True,
+        na_values=["", "NA", "N/A"],
+        on_bad_lines="warn",
+    )
+
+
+# -------------------------
+# Plots (one Figure per call, no pyplot global state)
+# -------------------------
+def _plot_years(df, outdir):
+    # Publications by year
+    if df["year"].notna().any():
+        # dense integer domain: bincount offset by the first year, no hashing or sort
+        years = df["year"].dropna().to_numpy(dtype=np.int32)
+        first = years.min()
+        year_counts = np.bincount(years - first)
+        fig = Figure(figsize=(8, 4))
+        ax = fig.subplots()
+        ax.bar(np.arange(first, first + len(year_counts)), year_counts)
+        ax.set_xlabel("Year")
+        ax.set_ylabel("Number of papers")
+        ax.set_title("Publications by Year")
+        fig.tight_layout()
+        path = os.path.join(outdir, "publications_by_year.png")
+        fig.savefig(path)
+        print("Saved:", path)
+    else:
+        print("No publish_time/year data available to plot publications by year.")
+
+
+def _plot_journals(df, outdir):
+    # Top journals
+    if "journal" in df.columns:
+        top_journals = df["journal"].value_counts().head(15)
+        top_journals = top_journals[top_journals > 0]
+        fig = Figure(figsize=(8, 5))
+        ax = fig.subplots()
+        ax.bar(range(len(top_journals)), top_journals.values)
+        ax.set_xticks(range(len(top_journals)))
+        ax.set_xticklabels(top_journals.index, rotation=45, ha="right")
+        ax.set_title("Top Journals (by paper count)")
+        fig.tight_layout()
+        path = os.path.join(outdir, "top_journals.png")
+        fig.savefig(path)
+        print("Saved:", path)
+    else:
+        print("No 'journal' column present for top_journals plot.")
+
+
+def _plot_sources(df, outdir):
+    # Top sources
+    if "source_x" in df.columns:
+        top_sources = df["source_x"].value_counts().head(15)
+        top_sources = top_sources[top_sources > 0]
+        fig = Figure(figsize=(8, 4))
+        ax = fig.subplots()
+        ax.bar(range(len(top_sources)), top_sources.values)
+        ax.set_xticks(range(len(top_sources)))
+        ax.set_xticklabels(top_sources.index, rotation=45, ha="right")
+        ax.set_title("Top Sources")
+        fig.tight_layout()
+        path = os.path.join(outdir, "top_sources.png")
+        fig.savefig(path)
+        print("Saved:", path)
+    else:
+        print("No 'source_x' column present for source counts.")
+
+
+def _plot_wordcloud(word_counts, outdir):
+    # Word cloud of titles, drawn from the precomputed counts (no joined corpus string)
+    if not word_counts.empty:
+        wc = WordCloud(width=1200, height=600, background_color="white").generate_from_frequencies(word_counts.to_dict())
+        path = os.path.join(outdir, "wordcloud_titles.png")
+        wc.to_file(path)
+        print("Saved wordcloud:", path)
+    else:
+        print("No titles to generate a word cloud.")
 
 
 # -------------------------
@@ -56,6 +288,7 @@ def main(input_path, outdir, sample_size):
 
     # normalize column names to be robust to spaces/case
     df = normalize_columns(df)
+    df = ensure_text_dtypes(df)
 
     # common names we expect (after normalization)
     expected = [
@@ -80,7 +313,6 @@ def main(input_path, outdir, sample_size):
         print("Warning: none of the expected columns found. I'll continue with whatever columns are present.")
     else:
         print("Using columns:", present)
-        df = df.copy()  # make a copy for safety
 
     # convert publish_time to datetime, extract year
     if "publish_time" in df.columns:
@@ -101,12 +333,12 @@ def main(input_path, outdir, sample_size):
         df["title"] = ""
 
     # derived columns
-    df["abstract_word_count"] = df["abstract"].str.split().str.len()
-    df["title_word_count"] = df["title"].str.split().str.len()
+    df["abstract_word_count"] = count_words(df["abstract"])
+    df["title_word_count"] = count_words(df["title"])
 
     # save cleaned full dataset
     cleaned_path = os.path.join(outdir, "metadata_cleaned.csv")
-    df.to_csv(cleaned_path, index=False)
+    write_csv(df, cleaned_path)
     print("Saved cleaned CSV:", cleaned_path)
 
     # save a sample for fast iteration (if sample_size provided)
@@ -114,73 +346,23 @@ def main(input_path, outdir, sample_size):
         n = min(sample_size, len(df))
         sample = df.sample(n=n, random_state=42)
         sample_path = os.path.join(outdir, "sample_metadata.csv")
-        sample.to_csv(sample_path, index=False)
+        write_csv(sample, sample_path)
         print("Saved sample CSV:", sample_path)
+        parquet_path = os.path.join(outdir, "sample_metadata.parquet")
+        sample.to_parquet(parquet_path, compression="zstd", index=False)
+        print("Saved sample Parquet:", parquet_path)
 
-    # -------------------------
-    # Analysis & visualizations
-    # -------------------------
-    # Publications by year
-    if df["year"].notna().any():
-        year_counts = df["year"].dropna().astype(int).value_counts().sort_index()
-        fig, ax = plt.subplots(figsize=(8, 4))
-        ax.bar(year_counts.index, year_counts.values)
-        ax.set_xlabel("Year")
-        ax.set_ylabel("Number of papers")
-        ax.set_title("Publications by Year")
-        fig.tight_layout()
-        path = os.path.join(outdir, "publications_by_year.png")
-        fig.savefig(path)
-        plt.close(fig)
-        print("Saved:", path)
-    else:
-        print("No publish_time/year data available to plot publications by year.")
+    # low-cardinality labels as categoricals: value_counts becomes a bincount over integer codes.
+    # Missing values go into an "Unknown" category once here, so the plots need no fillna pass;
+    # this runs after the CSV/Parquet writes so the saved files still show them as missing.
+    for c in ("source_x", "journal"):
+        if c in df.columns:
+            cat = df[c].astype("category")
+            if "Unknown" not in cat.cat.categories:  # already present when re-reading our own outputs
+                cat = cat.cat.add_categories(["Unknown"])
+            df[c] = cat.fillna("Unknown")
 
-    # Top journals
-    if "journal" in df.columns:
-        top_journals = df["journal"].fillna("Unknown").value_counts().head(15)
-        fig, ax = plt.subplots(figsize=(8, 5))
-        ax.bar(range(len(top_journals)), top_journals.values)
-        ax.set_xticks(range(len(top_journals)))
-        ax.set_xticklabels(top_journals.index, rotation=45, ha="right")
-        ax.set_title("Top Journals (by paper count)")
-        fig.tight_layout()
-        path = os.path.join(outdir, "top_journals.png")
-        fig.savefig(path)
-        plt.close(fig)
-        print("Saved:", path)
-    else:
-        print("No 'journal' column present for top_journals plot.")
-
-    # Top sources
-    if "source_x" in df.columns:
-        top_sources = df["source_x"].fillna("Unknown").value_counts().head(15)
-        fig, ax = plt.subplots(figsize=(8, 4))
-        ax.bar(range(len(top_sources)), top_sources.values)
-        ax.set_xticks(range(len(top_sources)))
-        ax.set_xticklabels(top_sources.index, rotation=45, ha="right")
-        ax.set_title("Top Sources")
-        fig.tight_layout()
-        path = os.path.join(outdir, "top_sources.png")
-        fig.savefig(path)
-        plt.close(fig)
-        print("Saved:", path)
-    else:
-        print("No 'source_x' column present for source counts.")
-
-    # Word cloud of titles
-    all_titles = " ".join(df["title"].dropna().astype(str).values)
-    if len(all_titles.strip()) > 0:
-        wc = WordCloud(width=1200, height=600, background_color="white").generate(all_titles)
-        path = os.path.join(outdir, "wordcloud_titles.png")
-        wc.to_file(path)
-        print("Saved wordcloud:", path)
-    else:
-        print("No titles to generate a word cloud.")
-
-    # Top title words CSV (simple tokenization and stopwords filtering)
-    text = all_titles.lower()
-    words = re.findall(r"\b\w+\b", text)
+    # Top title words (simple tokenization and stopwords filtering)
     stopwords = set(
         [
             "the",
@@ -221,10 +403,14 @@ def main(input_path, outdir, sample_size):
             "novel",
         ]
     )
-    filtered = [w for w in words if w not in stopwords and len(w) > 2]
-    counter = Counter(filtered)
-    most = counter.most_common(200)
-    top_words_df = pd.DataFrame(most, columns=["word", "count"])
+    vc = title_word_counts(df["title"], stopwords).head(200)
+
+    _plot_years(df, outdir)
+    _plot_journals(df, outdir)
+    _plot_sources(df, outdir)
+    _plot_wordcloud(vc, outdir)
+
+    top_words_df = vc.rename_axis("word").reset_index(name="count")
     tpath = os.path.join(outdir, "top_title_words.csv")
     top_words_df.to_csv(tpath, index=False)
     print("Saved top words CSV:", tpath)
@@ -235,9 +421,9 @@ def main(input_path, outdir, sample_size):
     if "year" in df.columns:
         print("Years present:", df["year"].dropna().astype(int).unique()[:20])
     if "journal" in df.columns:
-        print("Unique journals:", df["journal"].nunique())
+        print("Unique journals:", df["journal"].cat.remove_categories(["Unknown"]).nunique())
     if "source_x" in df.columns:
-        print("Unique sources:", df["source_x"].nunique())
+        print("Unique sources:", df["source_x"].cat.remove_categories(["Unknown"]).nunique())
 
     print("\nDone.")
 
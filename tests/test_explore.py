@@ -0,0 +1,57 @@
+import os
+import re
+import sys
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "scripts"))
+import explore  # noqa: E402
+
+STOPWORDS = {"the", "and", "of", "covid", "sars", "2019"}
+
+TITLES = [
+    "The ACE2 receptor and SARS-CoV-2 entry",
+    "COVID–19 in patients’ homes",
+    "non breaking space and sars‑cov‑2",
+    "él Étude de la naïveté étude",
+    "receptor binding of the spike; receptor ACE2",
+    "snake_case x_y covid_19 2019-nCoV 2020",
+    "",
+    None,
+    "entry entry patients homes",
+    "ΣΑΣ ΟΔΟΣ İstanbul İİİ",
+]
+
+
+def _baseline(titles, stopwords):
+    # the original Counter-based implementation
+    text = " ".join(pd.Series(titles).dropna().astype(str).values).lower()
+    words = re.findall(r"\b\w+\b", text)
+    return Counter(w for w in words if w not in stopwords and len(w) > 2).most_common()
+
+
+def _counts(monkeypatch, use_numba):
+    if not use_numba:
+        monkeypatch.setattr(explore, "nb", None)
+    titles = pd.Series(TITLES, dtype="string[pyarrow]")
+    return list(explore.title_word_counts(titles, STOPWORDS).items())
+
+
+def test_title_word_counts_regex_path_matches_baseline(monkeypatch):
+    assert _counts(monkeypatch, use_numba=False) == _baseline(TITLES, STOPWORDS)
+
+
+def test_title_word_counts_numba_path_matches_regex_path(monkeypatch):
+    if explore.nb is None:
+        pytest.skip("numba not installed")
+    fast = _counts(monkeypatch, use_numba=True)
+    assert fast == _counts(monkeypatch, use_numba=False)
+    assert fast == _baseline(TITLES, STOPWORDS)
+
+
+def test_count_words_matches_str_split():
+    texts = ["", "  one  ", "a\xa0b", "a b c", "x\vy", "p\x1cq\x85r s　t", "tab\tnew\nline"]
+    s = pd.Series(texts, index=range(10, 10 + len(texts)), dtype="string[pyarrow]")
+    assert explore.count_words(s).to_dict() == s.str.split().str.len().to_dict()